@@ -14,63 +14,73 @@ https://i.pinimg.com/originals/1c/e8/e7/1ce8e79e2d1121c1bd2f3089200cbe42.jpg
 from __future__ import annotations
 
 from abc import abstractmethod
+from array import array
 from contextlib import suppress
 from dataclasses import dataclass, field
-from enum import Enum
-from itertools import accumulate, chain
+from functools import lru_cache
+from itertools import accumulate
+from math import inf
 from random import choice, randrange
-from typing import ClassVar, Container, Final, Iterable, Optional, Protocol
+from typing import ClassVar, Final, Iterable, MutableSequence, Optional, Protocol, Sequence
 
 
-class Color(Enum):
-    RED = 'R'
-    YELLOW = 'Y'
-    GREEN = 'G'
-    BLUE = 'B'
-    WHITE = 'W'
+# Colors are plain ints. A row's color is also its row id.
+RED: Final[int] = 0
+YELLOW: Final[int] = 1
+GREEN: Final[int] = 2
+BLUE: Final[int] = 3
+WHITE: Final[int] = 4
+ROW_COLORS: Final[tuple[int, int, int, int]] = (RED, YELLOW, GREEN, BLUE)
+_COLOR_CHARS: Final[str] = 'RYGBW'
+_CHAR_TO_COLOR: Final[dict[str, int]] = {c: i for i, c in enumerate(_COLOR_CHARS)}
 
-    def __str__(self):
-        return self.value
-
-
-ROW_COLORS: Final[tuple[Color, Color, Color, Color]] = (Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE)
 
+@dataclass(slots=True)
+class Dice:
+    """The faces of each die, in the order of COLORS. Dice of locked rows aren't rolled and show 0."""
+    faces: array = field(default_factory=lambda: array('b', bytes(len(Dice.COLORS))))
+    NON_GRID_COLORS: ClassVar[tuple[int, int]] = (WHITE, WHITE)
+    COLORS: ClassVar[tuple[int, int, int, int, int, int]] = NON_GRID_COLORS + ROW_COLORS
 
-@dataclass(frozen=True)
-class Die:
-    color: Color
-    face: int = field(default_factory=lambda: randrange(1, 7))
-
-    def __add__(self, other) -> int:
-        return self.face + other
+    def __str__(self):
+        return ' '.join(f'{_COLOR_CHARS[c]}{face}' for c, face in zip(self.COLORS, self.faces) if face)
 
-    def __radd__(self, other) -> int:
-        return other + self.face
+    @classmethod
+    def roll(cls, locked_mask: int = 0) -> Dice:
+        """Roll every die except those of locked rows, where bit i of locked_mask is set when row i is locked."""
+        return cls(array('b', _roll_faces(locked_mask)))
 
-    def __str__(self):
-        return f'{self.color}{self.face}'
+    def reroll(self, locked_mask: int = 0) -> None:
+        """Like roll, but in place."""
+        for i, face in enumerate(_roll_faces(locked_mask)):
+            self.faces[i] = face
 
+    def close(self, locked_mask: int) -> None:
+        """Take the dice of rows locked since the roll out of the game."""
+        _close_faces(self.faces, locked_mask)
 
-class Dice(tuple[Die, ...]):
-    NON_GRID_COLORS: Final[tuple[Color, Color]] = (Color.WHITE, Color.WHITE)
-    COLORS: Final[tuple[Color, Color, Color, Color, Color, Color]] = NON_GRID_COLORS + ROW_COLORS
 
-    @classmethod
-    def roll(cls, locked: Container[int] = ()) -> Dice:
-        return Dice([Die(c) for c in cls.COLORS if c not in locked])
+def _roll_faces(locked_mask: int) -> list[int]:
+    """Faces in the order of Dice.COLORS, decoded from a single draw of the PRNG. Dice of locked rows show 0."""
+    n = randrange(6 ** len(Dice.COLORS))
+    faces = []
+    for _ in Dice.COLORS:
+        n, face = divmod(n, 6)
+        faces.append(face + 1)
+    _close_faces(faces, locked_mask)
+    return faces
 
-    def table_takes(self) -> Iterable[Take]:
-        total = sum(self[:(len(self.NON_GRID_COLORS))])
-        return tuple((Take(i, total)) for i, _ in enumerate(ROW_COLORS))
 
-    def roller_takes(self) -> Iterable[Take]:
-        color_map = {c: i for i, c in enumerate(ROW_COLORS)}
-        n = len(self.NON_GRID_COLORS)
-        for w, c in zip(self[:n], self[n:]):
-            yield Take(color_map[c.color], w + c)
+def _close_faces(faces: MutableSequence[int], locked_mask: int) -> None:
+    """Set the faces of the dice of locked rows to 0."""
+    if locked_mask:
+        n_white = len(Dice.NON_GRID_COLORS)
+        for i in ROW_COLORS:
+            if locked_mask >> i & 1:
+                faces[n_white + i] = 0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Take:
     """Taking some combination of dice to mark a spot."""
     row_id: int
@@ -79,128 +89,333 @@ class Take:
     @classmethod
     def from_string(cls, s: str) -> Take:
         try:
-            color = Color(s[0].upper())
-            row_id = ROW_COLORS.index(color)
+            row_id = _CHAR_TO_COLOR[s[0].upper()]
+            if row_id not in ROW_COLORS:
+                raise ValueError
             return cls(row_id, int(s[1:]))
         except (KeyError, IndexError, ValueError):
             raise ValueError
 
     def __str__(self):
-        return f"{ROW_COLORS[self.row_id]}{self.spot}"
+        return f"{_COLOR_CHARS[self.row_id]}{self.spot}"
+
+
+# Every take there is, indexed by row and spot, so the takes handed out each round are shared rather than built.
+_TAKES: Final[tuple[tuple[Take, ...], ...]] = tuple(tuple(Take(i, spot) for spot in range(13)) for i in ROW_COLORS)
+
+
+@lru_cache(maxsize=None)
+def table_takes(total: int, locked_mask: int) -> tuple[Take, ...]:
+    """Taking total, the sum of the white dice, on any unlocked row."""
+    return tuple(_TAKES[i][total] for i in ROW_COLORS if not locked_mask >> i & 1)
+
+
+def roller_takes(faces: Sequence[int], locked_mask: int) -> tuple[Take, ...]:
+    """Either white die with any die of an unlocked row, without duplicates."""
+    n = len(Dice.NON_GRID_COLORS)
+    whites = faces[:n]
+    takes = []
+    for i in ROW_COLORS:
+        if not locked_mask >> i & 1:
+            row_takes = _TAKES[i]
+            for w, white in enumerate(whites):
+                if white not in whites[:w]:
+                    takes.append(row_takes[white + faces[n + i]])
+    return tuple(takes)
 
 
 Move = Optional[Take]  # It's always a move to take dice or not
 
+_SCORES: Final[tuple[int, ...]] = tuple(accumulate(range(13)))  # Score of a row by number of marks.
+# Score of a row indexed by (mark count << 1 | locked). Locking counts as an extra mark.
+_ROW_SCORE: Final[tuple[int, ...]] = tuple(
+    _SCORES[marks + locked] for marks in range(len(_SCORES) - 1) for locked in (0, 1)
+)
+
+
+def _valid_mask(marks_mask: int, spots_mask: int, last_spot_bit: int) -> int:
+    """Bits of the spots that can be marked next, given the bits already marked."""
+    # Everything to the right of the last mark. Once locked, that's nothing.
+    mask = spots_mask & ~((1 << marks_mask.bit_length()) - 1)
+    if marks_mask.bit_count() < Row.LOCK_REQUIRES:
+        mask &= ~last_spot_bit
+    return mask
+
+
+# Valid masks indexed by marks mask, one table per (spots_mask, last_spot_bit) layout. There are only 2^11 mark states
+# for a row, so every row, rollout and search looks its valid spots up here instead of working them out.
+_LEGAL_CACHE: dict[tuple[int, int], tuple[int, ...]] = {}
+
+
+def _legal_masks(spots_mask: int, last_spot_bit: int) -> tuple[int, ...]:
+    key = spots_mask, last_spot_bit
+    if key not in _LEGAL_CACHE:
+        _LEGAL_CACHE[key] = tuple(_valid_mask(m, spots_mask, last_spot_bit) for m in range(spots_mask + 1))
+    return _LEGAL_CACHE[key]
 
-@dataclass
+
+@dataclass(slots=True)
 class Row:
+    """
+    Marks are kept as a bitmask over the spots, bit i standing for spots[i].
+
+    spot_bits is indexed by pip value and gives that spot's bit, or 0 for values that aren't on the row.
+    """
     spots: tuple[int, ...]
-    marks: list[int] = field(default_factory=list)
-    LOCK_REQUIRES: Final[int] = 5  # Spots you need to mark before you can mark the final row and lock it.
+    marks_mask: int = 0
+    spot_bits: tuple[int, ...] = field(init=False, repr=False, compare=False)
+    spots_mask: int = field(init=False, repr=False, compare=False)
+    last_spot_shift: int = field(init=False, repr=False, compare=False)
+    last_spot_bit: int = field(init=False, repr=False, compare=False)
+    legal_masks: tuple[int, ...] = field(init=False, repr=False, compare=False)
+    LOCK_REQUIRES: ClassVar[int] = 5  # Spots you need to mark before you can mark the final row and lock it.
+
+    def __post_init__(self) -> None:
+        bits = {spot: 1 << i for i, spot in enumerate(self.spots)}
+        self.spot_bits = tuple(bits.get(n, 0) for n in range(max(self.spots) + 1))
+        self.spots_mask = (1 << len(self.spots)) - 1
+        self.last_spot_shift = len(self.spots) - 1
+        self.last_spot_bit = 1 << self.last_spot_shift
+        self.legal_masks = _legal_masks(self.spots_mask, self.last_spot_bit)
 
     def __str__(self) -> str:
         line = []
+        valid_mask = self.valid_mask
         for n in self.spots:
-            if n in self.marks:
+            if self.spot_bits[n] & self.marks_mask:
                 line.append('  X')
-            elif self.valid_spot(n):
+            elif self.spot_bits[n] & valid_mask:
                 line.append(f"{n:3d}")
             else:
                 line.append('   ')
         return f'{"".join(line)} {"X" if self.locked else "L"}'
 
     @property
-    def locked(self) -> bool:
-        return bool(self.marks) and self.marks[-1] == self.spots[-1]
+    def mark_count(self) -> int:
+        return self.marks_mask.bit_count()
 
     @property
-    def open_spots(self) -> tuple[int, ...]:
-        if not self.marks:
-            return self.spots
-        last_marked_i = self.spots.index(self.marks[-1])
-        return self.spots[last_marked_i + 1:]
+    def locked(self) -> int:
+        """1 if the last spot is marked, else 0. It's an int so it can be shifted into a mask of rows."""
+        return self.marks_mask >> self.last_spot_shift & 1
 
     @property
     def can_lock(self):
-        return len(self.marks) >= self.LOCK_REQUIRES
+        return self.mark_count >= self.LOCK_REQUIRES
+
+    @property
+    def valid_mask(self) -> int:
+        return self.legal_masks[self.marks_mask]
 
     def valid_spot(self, spot):
-        return spot in self.open_spots and not self.locked and (spot != self.spots[-1] or self.can_lock)
+        return 0 <= spot < len(self.spot_bits) and bool(self.spot_bits[spot] & self.legal_masks[self.marks_mask])
+
+    def mark(self, spot: int) -> None:
+        self.marks_mask |= self.spot_bits[spot]
+
+    def reset(self) -> None:
+        self.marks_mask = 0
 
     @property
     def score(self) -> int:
-        return Grid.SCORES[len(self.marks) + self.locked]
+        m = self.marks_mask
+        return _ROW_SCORE[m.bit_count() << 1 | m >> self.last_spot_shift & 1]
 
 
 class Grid(tuple[Row, Row, Row, Row]):
+    __slots__ = ()
     SPOTS: Final[tuple[range, ...]] = (
         (2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12),
         (2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12),
         (12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2),
         (12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2),
     )
-    SCORES: Final[tuple[int, ...]] = tuple(accumulate(range(13)))
+    SCORES: Final[tuple[int, ...]] = _SCORES
 
     def __new__(cls) -> Grid:
         return super().__new__(cls, map(Row, cls.SPOTS))
 
     def __str__(self) -> str:
-        return '\n'.join([f'{ROW_COLORS[i]}{row}' for i, row in enumerate(self)])
+        return '\n'.join([f'{_COLOR_CHARS[i]}{row}' for i, row in enumerate(self)])
 
     def valid_takes(self, takes: Iterable[Take]) -> Iterable[Take]:
-        return (take for take in takes if self[take.row_id].valid_spot(take.spot))
+        """Takes come from the dice, so their spots are always on the grid."""
+        spot_bits = [row.spot_bits for row in self]
+        valid_masks = [row.valid_mask for row in self]
+        return (take for take in takes if spot_bits[take.row_id][take.spot] & valid_masks[take.row_id])
+
+    @property
+    def marks_masks(self) -> tuple[int, ...]:
+        return tuple(row.marks_mask for row in self)
 
     @property
     def mark_count(self) -> int:
-        return sum(len(row.marks) for row in self)
+        return sum(row.marks_mask.bit_count() for row in self)
 
+    @property
+    def score(self) -> int:
+        return sum(row.score for row in self)
 
-@dataclass
+
+@dataclass(slots=True)
 class Card:
     grid: Grid = field(default_factory=Grid)
     penalties: int = 0
-    PENALTY_LIMIT: Final[ClassVar[int]] = 4
-    PENALTY_POINTS: Final[ClassVar[int]] = 5
+    PENALTY_LIMIT: ClassVar[int] = 4
+    PENALTY_POINTS: ClassVar[int] = 5
 
     def __str__(self):
         penalties = ' ' * 31 + 'X' * self.penalties + 'O' * (self.PENALTY_LIMIT - self.penalties)
         return f'{self.grid}\n{penalties}'
 
     def score(self) -> int:
-        return sum(row.score for row in self.grid) - self.penalties * self.PENALTY_POINTS
+        return self.grid.score - self.penalties * self.PENALTY_POINTS
 
     def locked_row_ids(self) -> Iterable[int]:
         return [i for i, row in enumerate(self.grid) if row.locked]
 
-    def valid_moves(self, takes: Iterable[Take]) -> Iterable[Move]:
-        yield None
-        yield from self.grid.valid_takes(takes)
+    def valid_moves(self, takes: Iterable[Take]) -> tuple[Move, ...]:
+        return (None, *self.grid.valid_takes(takes))
 
     def apply_take(self, take: Take) -> None:
-        self.grid[take.row_id].marks.append(take.spot)
+        self.grid[take.row_id].mark(take.spot)
+
+    def reset(self) -> None:
+        self.penalties = 0
+        for row in self.grid:
+            row.reset()
 
 
 class Player(Protocol):
     @abstractmethod
-    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Iterable[Move]) -> Move:
+    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Sequence[Move]) -> Move:
         pass
 
 
 class RandomPlayer(Player):
-    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Iterable[Move]) -> Move:
-        return choice(list(moves))
+    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Sequence[Move]) -> Move:
+        return choice(moves)
+
+
+class AlphaBetaPlayer(Player):
+    """
+    Picks the move with the best expected score a few rolls ahead, searching only its own card.
+
+    Other players only matter by locking rows, so there are no opponent nodes. Each roll ahead is a chance node over the
+    sum of the white dice, followed by a choice to mark any open row with it or pass. Chance nodes are cut off with
+    Star1 alpha-beta bounds: within the search passing keeps the current score, and each mark gains at most MAX_GAIN.
+    Results go in a transposition table of (lower, upper, depth) keyed on the card and the locked rows packed into an
+    int. It's kept between turns and games, and cleared once it holds TT_SIZE entries. Locked rows are read off the
+    dice, which show 0 for them.
+
+    Penalties aren't modeled: is_roller is ignored, so a roller passing both steps isn't charged for it, and the
+    penalties already on the card only shift every value by the same amount.
+    """
+    ROW_BITS: ClassVar[int] = 12
+    PENALTY_SHIFT: ClassVar[int] = 48
+    PENALTY_MASK: ClassVar[int] = 0xF
+    LOCKED_SHIFT: ClassVar[int] = 52
+    MAX_GAIN: ClassVar[int] = _SCORES[-1] - _SCORES[-3]  # Marking the last spot of a full row and locking it.
+    WHITE_SUMS: ClassVar[tuple[tuple[int, float], ...]] = tuple((n, (6 - abs(n - 7)) / 36) for n in range(2, 13))
+    TT_SIZE: ClassVar[int] = 1 << 18
+
+    def __init__(self, depth: int = 2):
+        self.depth = depth
+        self._rows = tuple(map(Row, Grid.SPOTS))  # Only used for their bit layouts.
+        self._tt: dict[int, tuple[float, float, int]] = {}
+
+    @classmethod
+    def pack(cls, card: Card, locked_mask: int = 0) -> int:
+        state = locked_mask << cls.LOCKED_SHIFT | card.penalties << cls.PENALTY_SHIFT
+        for i, marks_mask in enumerate(card.grid.marks_masks):
+            state |= marks_mask << (i * cls.ROW_BITS)
+        return state
+
+    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Sequence[Move]) -> Move:
+        n_white = len(Dice.NON_GRID_COLORS)
+        locked_mask = sum((face == 0) << i for i, face in enumerate(dice.faces[n_white:]))
+        state = self.pack(card, locked_mask)
+        if len(self._tt) >= self.TT_SIZE:
+            self._tt.clear()
+        after = {move: self._apply(state, move) for move in moves}
+        best_move, best = None, -inf
+        for move in sorted(moves, key=lambda m: self._evaluate(after[m]), reverse=True):
+            value = self._chance(after[move], self.depth, best, inf)
+            if value > best:
+                best_move, best = move, value
+        return best_move
+
+    def _apply(self, state: int, move: Move) -> int:
+        if move is None:
+            return state
+        return state | self._rows[move.row_id].spot_bits[move.spot] << (move.row_id * self.ROW_BITS)
+
+    def _evaluate(self, state: int) -> int:
+        score = -(state >> self.PENALTY_SHIFT & self.PENALTY_MASK) * Card.PENALTY_POINTS
+        for i, row in enumerate(self._rows):
+            m = state >> (i * self.ROW_BITS) & row.spots_mask
+            score += _ROW_SCORE[m.bit_count() << 1 | m >> row.last_spot_shift & 1]
+        return score
+
+    def _chance(self, state: int, depth: int, alpha: float, beta: float) -> float:
+        """Expected value of rolling from state with depth rolls left."""
+        if depth == 0:
+            return self._evaluate(state)
+        entry = self._tt.get(state)
+        if entry is not None and entry[2] == depth:
+            lower, upper, _ = entry
+            if lower >= beta or lower == upper:
+                return lower
+            if upper <= alpha:
+                return upper
+        low = self._evaluate(state)
+        high = low + depth * self.MAX_GAIN
+        expected, remaining = 0.0, 1.0
+        for total, p in self.WHITE_SUMS:
+            remaining -= p
+            child_alpha = (alpha - expected - remaining * high) / p
+            child_beta = (beta - expected - remaining * low) / p
+            expected += p * self._choose(state, total, depth, max(child_alpha, low), min(child_beta, high))
+            if expected + remaining * high <= alpha:
+                self._tt[state] = (low, expected + remaining * high, depth)
+                return expected + remaining * high
+            if expected + remaining * low >= beta:
+                self._tt[state] = (expected + remaining * low, high, depth)
+                return expected + remaining * low
+        self._tt[state] = (expected, expected, depth)
+        return expected
+
+    def _choose(self, state: int, total: int, depth: int, alpha: float, beta: float) -> float:
+        """Best value of marking total on any row that isn't locked, or passing."""
+        children = [state]
+        locked_mask = state >> self.LOCKED_SHIFT
+        for i, row in enumerate(self._rows):
+            if locked_mask >> i & 1:
+                continue
+            shift = i * self.ROW_BITS
+            bit = row.spot_bits[total] & row.legal_masks[state >> shift & row.spots_mask]
+            if bit:
+                children.append(state | bit << shift)
+        children.sort(key=self._evaluate, reverse=True)
+        best = -inf
+        for child in children:
+            value = self._chance(child, depth - 1, max(alpha, best), beta)
+            if value > best:
+                best = value
+                if best >= beta:
+                    break
+        return best
 
 
 class HumanPlayer(Player):
     def __init__(self, name):
         self.name = name
 
-    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Iterable[Move]) -> Move:
-        moves = set(moves)
+    def take_turn(self, card: Card, dice: Dice, is_roller: bool, moves: Sequence[Move]) -> Move:
         print('\n' * 10)
         print(self.name)
         print(card)
-        print(' '.join(map(str, dice)))
+        print(dice)
         print('Roller' if is_roller else 'Watcher')
         move = object()
         while move not in moves:
@@ -213,12 +428,14 @@ class HumanPlayer(Player):
         return move
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     players: tuple[Player, ...]
     cards: tuple[Card, ...] = field(init=False)
     roller_id: int = 0
-    dice: Dice = Dice.roll()
+    dice: Dice = field(default_factory=Dice)
+    _locked_mask: int = field(default=0, init=False, repr=False)  # Bit i is set once any card locks row i.
+    _max_penalty: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.cards = tuple(Card() for _ in self.players)
@@ -232,10 +449,10 @@ class Game:
         return self.cards[self.roller_id]
 
     def locked(self) -> set[int]:
-        return set(chain(*[card.locked_row_ids() for card in self.cards]))
+        return {i for i in ROW_COLORS if self._locked_mask >> i & 1}
 
     def is_over(self) -> bool:
-        return len(self.locked()) > 1 or max(c.penalties for c in self.cards) >= Card.PENALTY_LIMIT
+        return self._locked_mask.bit_count() > 1 or self._max_penalty >= Card.PENALTY_LIMIT
 
     def scores(self):
         return [card.score() for card in self.cards]
@@ -245,25 +462,34 @@ class Game:
         move = player.take_turn(card, self.dice, self.roller is player, moves)
         if move is not None:
             card.apply_take(move)
+            self._locked_mask |= card.grid[move.row_id].locked << move.row_id
+
+    def _add_penalty(self, card_id: int) -> None:
+        card = self.cards[card_id]
+        card.penalties += 1
+        self._max_penalty = max(self._max_penalty, card.penalties)
 
     def take_white(self):
-        table_takes = self.dice.table_takes()
+        # Everyone takes the white dice at once, so a row one player locks here is still open to the others.
+        faces = self.dice.faces
+        takes = table_takes(faces[0] + faces[1], self._locked_mask)
         for i, (player, card) in enumerate(zip(self.players, self.cards)):
-            self.turn(player, card, table_takes)
+            self.turn(player, card, takes)
 
     def take_colors(self):
-        roller_takes = self.dice.roller_takes()
-        self.turn(self.roller, self.roller_card, roller_takes)
+        takes = roller_takes(self.dice.faces, self._locked_mask)
+        self.turn(self.roller, self.roller_card, takes)
 
     def do_round(self) -> bool:
-        self.dice = Dice.roll(self.locked())
+        self.dice.reroll(self._locked_mask)
         roller_marks = self.roller_card.grid.mark_count
         self.take_white()
         if self.is_over():
             return True
+        self.dice.close(self._locked_mask)  # Rows locked on the white dice are closed before the roller takes colors.
         self.take_colors()
         if roller_marks == self.roller_card.grid.mark_count:
-            self.roller_card.penalties += 1
+            self._add_penalty(self.roller_id)
         self.roller_id = (self.roller_id + 1) % len(self.players)
         return self.is_over()
 
@@ -273,5 +499,99 @@ class Game:
             is_over = self.do_round()
         return self.scores()
 
+    def reset(self) -> None:
+        """Start over with the same players, reusing the cards. The dice get rerolled at the start of every round."""
+        for card in self.cards:
+            card.reset()
+        self.roller_id = 0
+        self._locked_mask = 0
+        self._max_penalty = 0
+
+
+class MCTSRollout:
+    """Plays out games one after another on a single reused Game, so keep one per worker."""
+
+    def __init__(self, players: tuple[Player, ...]):
+        self.game = Game(players)
+
+    def play(self, n_games: int) -> list[list[int]]:
+        results = []
+        for _ in range(n_games):
+            self.game.reset()
+            results.append(self.game.play())
+        return results
+
+
+def _random_turn(
+        masks: list[int], takes: Iterable[Take], spot_bits: tuple[tuple[int, ...], ...],
+        legal_masks: tuple[tuple[int, ...], ...], last_spot_bit: int, choice=choice,
+) -> Optional[int]:
+    """
+    Mark a random valid take (or nothing) on a card of bare row masks.
+
+    Returns None if nothing was marked, otherwise the bit to add to the locked mask (0 when no row got locked).
+    """
+    # This is the innermost loop of a rollout, so everything it touches is bound locally.
+    moves = [None]
+    for take in takes:
+        row_id = take.row_id
+        bit = spot_bits[row_id][take.spot] & legal_masks[row_id][masks[row_id]]
+        if bit:
+            moves.append((row_id, bit))
+    move = choice(moves)
+    if move is None:
+        return None
+    row_id, bit = move
+    masks[row_id] |= bit
+    return (bit == last_spot_bit) << row_id
+
+
+def simulate_random(n_games: int, n_players: int = 2) -> list[list[int]]:
+    """
+    Play out games between RandomPlayers and return the scores of each one.
+
+    This plays exactly like Game((RandomPlayer(),) * n_players).play(), but a card is only four row masks and a penalty
+    count, so there are no Cards, Dice or Moves to build. It's meant for Monte Carlo rollouts.
+    """
+    rows = tuple(map(Row, Grid.SPOTS))  # Only used for their bit layouts.
+    legal_masks = tuple(row.legal_masks for row in rows)
+    last_spot_bit = rows[0].last_spot_bit
+    spot_bits = tuple(row.spot_bits for row in rows)
+    last_spot_shift = rows[0].last_spot_shift
+    row_score = _ROW_SCORE
+    penalty_limit = Card.PENALTY_LIMIT
+    results = []
+    for _ in range(n_games):
+        cards = [[0] * len(rows) for _ in range(n_players)]
+        penalties = [0] * n_players
+        locked = 0
+        roller_id = 0
+        while True:
+            faces = _roll_faces(locked)
+            takes = table_takes(faces[0] + faces[1], locked)
+            roller_marked = False
+            for i, masks in enumerate(cards):
+                lock = _random_turn(masks, takes, spot_bits, legal_masks, last_spot_bit)
+                if lock is not None:
+                    locked |= lock
+                    roller_marked |= i == roller_id
+            if locked.bit_count() > 1 or max(penalties) >= penalty_limit:
+                break
+            _close_faces(faces, locked)
+            takes = roller_takes(faces, locked)
+            lock = _random_turn(cards[roller_id], takes, spot_bits, legal_masks, last_spot_bit)
+            if lock is not None:
+                locked |= lock
+            elif not roller_marked:
+                penalties[roller_id] += 1
+            roller_id = (roller_id + 1) % n_players
+            if locked.bit_count() > 1 or max(penalties) >= penalty_limit:
+                break
+        results.append([
+            sum(row_score[m.bit_count() << 1 | m >> last_spot_shift & 1] for m in masks) - p * Card.PENALTY_POINTS
+            for masks, p in zip(cards, penalties)
+        ])
+    return results
+
 
 # print(Game((HumanPlayer('Mars'), HumanPlayer('Travis'))).play())
@@ -0,0 +1,72 @@
+import random
+import unittest
+from math import inf
+
+from qwixx import AlphaBetaPlayer, Game, MCTSRollout, RandomPlayer, _valid_mask, simulate_random
+
+
+class TestSimulateRandom(unittest.TestCase):
+    """simulate_random copies the round logic of Game, so it has to stay in step with it, random draw for draw."""
+
+    def test_matches_game(self):
+        for n_players in range(1, 6):
+            for seed in range(50):
+                with self.subTest(n_players=n_players, seed=seed):
+                    random.seed(seed)
+                    expected = Game(tuple(RandomPlayer() for _ in range(n_players))).play()
+                    random.seed(seed)
+                    self.assertEqual(simulate_random(1, n_players), [expected])
+
+    def test_matches_rollout(self):
+        for n_players in range(1, 6):
+            with self.subTest(n_players=n_players):
+                rollout = MCTSRollout(tuple(RandomPlayer() for _ in range(n_players)))
+                random.seed(n_players)
+                expected = rollout.play(50)
+                random.seed(n_players)
+                self.assertEqual(simulate_random(50, n_players), expected)
+
+
+class TestAlphaBetaPlayer(unittest.TestCase):
+    def brute_force(self, player: AlphaBetaPlayer, state: int, depth: int) -> float:
+        """Plain expectimax over the same tree, with no pruning and no transposition table."""
+        if depth == 0:
+            return player._evaluate(state)
+        locked_mask = state >> player.LOCKED_SHIFT
+        expected = 0.0
+        for total, p in player.WHITE_SUMS:
+            children = [state]
+            for i, row in enumerate(player._rows):
+                shift = i * player.ROW_BITS
+                marks_mask = state >> shift & row.spots_mask
+                bit = row.spot_bits[total] & _valid_mask(marks_mask, row.spots_mask, row.last_spot_bit)
+                if bit and not locked_mask >> i & 1:
+                    children.append(state | bit << shift)
+            expected += p * max(self.brute_force(player, child, depth - 1) for child in children)
+        return expected
+
+    @staticmethod
+    def random_state(rng: random.Random) -> int:
+        rows = 0x07FF07FF07FF07FF
+        marks = rng.getrandbits(48) & rng.getrandbits(48) & rng.getrandbits(48) & rows
+        penalties = rng.randrange(AlphaBetaPlayer.PENALTY_MASK + 1) << AlphaBetaPlayer.PENALTY_SHIFT
+        return marks | penalties | rng.getrandbits(4) << AlphaBetaPlayer.LOCKED_SHIFT
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        player = AlphaBetaPlayer()  # The table is shared across positions and windows, like it is across turns.
+        for depth, n_states in ((1, 100), (2, 40), (3, 8)):
+            for _ in range(n_states):
+                state = self.random_state(rng)
+                expected = self.brute_force(player, state, depth)
+                with self.subTest(state=hex(state), depth=depth):
+                    self.assertAlmostEqual(player._chance(state, depth, -inf, inf), expected)
+                    # A search with a window has to land on the right side of it, whatever it returns.
+                    alpha, beta = expected - 1, expected + 1
+                    self.assertAlmostEqual(player._chance(state, depth, alpha, beta), expected)
+                    self.assertLessEqual(player._chance(state, depth, expected + 1, expected + 2), expected + 1)
+                    self.assertGreaterEqual(player._chance(state, depth, expected - 2, expected - 1), expected - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()